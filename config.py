@@ -4,5 +4,10 @@ class Settings(BaseSettings):
     app_name: str = "Retail Sales Analytics Platform"
     min_row_count: int = 50
     upload_dir: str = "uploads"
+    # Approximate mode: stratified Sales sample built at ingest
+    approx_min_rows: int = 1_000_000
+    approx_sample_fraction: float = 0.01
+    approx_min_per_stratum: int = 2
+    approx_max_sample_fraction: float = 0.05
 
 settings = Settings()
\ No newline at end of file
@@ -3,6 +3,8 @@ import pandas as pd
 import os
 from utils.ui import load_css
 from models.schemas import SHEET_SCHEMAS
+from config import settings
+from utils.sampling import build_stratified_sample
 
 st.set_page_config(page_title="Data Setup", layout="wide", page_icon="📂")
 load_css()
@@ -65,9 +67,25 @@ if uploaded_file is not None:
                     dfs[sheet] = df
                     st.write(f"✅ {sheet}: Validated {len(df)} records")
                     
+                # Stratified sample for approximate mode on large Sales sheets
+                sales_sample = None
+                if len(dfs['Sales']) >= settings.approx_min_rows:
+                    st.write("⚡ Building stratified Sales sample...")
+                    sales_sample = build_stratified_sample(
+                        dfs['Sales'],
+                        fraction=settings.approx_sample_fraction,
+                        min_per_stratum=settings.approx_min_per_stratum,
+                        max_fraction=settings.approx_max_sample_fraction
+                    )
+                    st.write(f"✅ Sample: {len(sales_sample):,} of {len(dfs['Sales']):,} Sales records")
+                    if len(sales_sample) > settings.approx_max_sample_fraction * len(dfs['Sales']):
+                        st.warning("⚠️ Sales strata are too small to sample efficiently; approximate mode will be slower than expected.")
+                    
                 status.update(label="✨ Data successfully loaded!", state="complete", expanded=False)
                 
             st.session_state.dfs = dfs
+            st.session_state.sales_sample = sales_sample
+            st.session_state.pop("exact_overview_job", None)
             st.session_state.data_loaded = True
             
         except Exception as e:
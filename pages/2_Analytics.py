@@ -2,36 +2,131 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import time
+from concurrent.futures import ThreadPoolExecutor
 from utils.ui import load_css, metric_card
+from utils.sampling import Z_95, estimate_sum, filter_sample_by_date, population_count
 
 st.set_page_config(page_title="Branch Analytics", layout="wide", page_icon="📈")
 load_css()
 
 # --- Helper Functions ---
-def filter_by_date(df, date_col):
-    if df is None or date_col not in df.columns:
-        return df
-    
-    df[date_col] = pd.to_datetime(df[date_col])
-    min_date = df[date_col].min().date()
-    max_date = df[date_col].max().date()
-    
+def date_range_input(min_date, max_date):
+    """Renders the global sidebar date filter; returns None when there is nothing to filter."""
     if pd.isnull(min_date) or pd.isnull(max_date) or min_date == max_date:
-        return df
+        return None
 
     st.sidebar.subheader("📅 Global Date Filter")
-    date_range = st.sidebar.date_input(
+    return st.sidebar.date_input(
         "Select Range",
         value=(min_date, max_date),
         min_value=min_date,
         max_value=max_date,
         key="global_date_filter"
     )
+
+def apply_date_range(df, date_col, date_range):
+    if date_range is None or len(date_range) != 2:
+        return df
+    start = pd.Timestamp(date_range[0])
+    end = pd.Timestamp(date_range[1]) + pd.Timedelta(days=1)
+    return df[(df[date_col] >= start) & (df[date_col] < end)]
+
+def load_sales(df_raw, date_range):
+    """Copies the raw Sales sheet, parses dates and applies the global filter."""
+    df = df_raw.copy()
+    df['Date'] = pd.to_datetime(df['Date'])
+    return apply_date_range(df, 'Date', date_range)
+
+def compute_exact_sales(df_raw, date_range):
+    """Background job: the filtered Sales frame and its exact Overview aggregates."""
+    df = load_sales(df_raw, date_range)
+    return df, summarize_sales(df)
+
+def exact_sales_job(df_raw, date_range):
+    """Returns the future for `compute_exact_sales`, reused across reruns for the same range.
+
+    A single worker is kept in the session so jobs never compete with each other;
+    a superseded job is cancelled if still queued, otherwise it finishes and is ignored.
+    """
+    key = tuple(date_range) if date_range is not None else None
+    job = st.session_state.get('exact_overview_job')
+    if job is not None and job['key'] == key:
+        return job['future']
+    if job is not None:
+        job['future'].cancel()
+    
+    if 'exact_executor' not in st.session_state:
+        st.session_state.exact_executor = ThreadPoolExecutor(max_workers=1)
+    future = st.session_state.exact_executor.submit(compute_exact_sales, df_raw, date_range)
+    st.session_state.exact_overview_job = {'key': key, 'future': future}
+    return future
+
+def summarize_sales(df):
+    """Exact Sales aggregates used by the Overview tab."""
+    return {
+        'total_sales': df['Total_Sales'].sum(),
+        'total_sales_se': 0,
+        'total_orders': len(df),
+        'sales_ts': df.groupby(pd.Grouper(key='Date', freq='D'))['Total_Sales'].sum().reset_index(),
+        'top_cat': df.groupby('Category')['Total_Sales'].sum().reset_index().sort_values('Total_Sales', ascending=False),
+    }
+
+def summarize_sales_sample(sample):
+    """Estimated Sales aggregates (with standard errors) from the stratified sample."""
+    total_sales, total_sales_se = estimate_sum(sample, 'Total_Sales')
+    sales_ts = estimate_sum(sample, 'Total_Sales', by='_day').rename(columns={'_day': 'Date', 'estimate': 'Total_Sales'})
+    top_cat = estimate_sum(sample, 'Total_Sales', by='Category').rename(columns={'estimate': 'Total_Sales'})
+    top_cat['Error'] = Z_95 * top_cat.pop('se')
+    return {
+        'total_sales': total_sales,
+        'total_sales_se': total_sales_se,
+        'total_orders': population_count(sample),
+        'sales_ts': sales_ts.sort_values('Date')[['Date', 'Total_Sales']],
+        'top_cat': top_cat.sort_values('Total_Sales', ascending=False),
+    }
+
+def render_overview(slots, summary, total_expenses, exp_ts, stage):
+    """Draws the Overview KPIs and sales charts into their placeholders."""
+    total_sales = summary['total_sales']
+    net_profit = total_sales - total_expenses
+    profit_margin = (net_profit / total_sales * 100) if total_sales > 0 else 0
+    total_orders = summary['total_orders']
+    
+    # 95% error bound; expenses and order counts are exact, so only sales-derived cards carry one
+    sales_err = Z_95 * summary['total_sales_se']
+    error = f"± ${sales_err:,.0f} (95% CI)" if sales_err else None
+    
+    with slots['kpis'].container():
+        k1, k2, k3, k4 = st.columns(4)
+        metric_card(k1, "Total Sales", f"${total_sales:,.0f}", "Gross Revenue", error=error)
+        metric_card(k2, "Total Expenses", f"${total_expenses:,.0f}", "Operational Costs")
+        metric_card(k3, "Net Profit", f"${net_profit:,.0f}", f"Margin: {profit_margin:.1f}%", error=error)
+        metric_card(k4, "Total Orders", f"{total_orders:,}", "Transactions handled")
+    
+    sales_ts = summary['sales_ts']
+    fig_ts = go.Figure()
+    fig_ts.add_trace(go.Scatter(x=sales_ts['Date'], y=sales_ts['Total_Sales'], mode='lines', name='Sales', line=dict(color='#00CC96', width=3)))
+    fig_ts.add_trace(go.Scatter(x=exp_ts['Date'], y=exp_ts['Amount'], mode='lines', name='Expenses', line=dict(color='#EF553B', width=3)))
+    fig_ts.update_layout(template="plotly_dark", hovermode="x unified", legend=dict(orientation="h", y=1.1))
+    slots['ts'].plotly_chart(fig_ts, width='stretch', key=f"overview_ts_{stage}")
     
-    if len(date_range) == 2:
-        mask = (df[date_col].dt.date >= date_range[0]) & (df[date_col].dt.date <= date_range[1])
-        return df[mask]
-    return df
+    fig_water = go.Figure(go.Waterfall(
+        orientation = "v",
+        measure = ["relative", "relative", "total"],
+        x = ["Sales", "Expenses", "Net Profit"],
+        y = [total_sales, -total_expenses, net_profit],
+        connector = {"line":{"color":"gray"}},
+        text = [f"${total_sales/1000:.1f}k", f"-${total_expenses/1000:.1f}k", f"${net_profit/1000:.1f}k"],
+        textposition = "auto"
+    ))
+    fig_water.update_layout(template="plotly_dark", showlegend=False)
+    slots['water'].plotly_chart(fig_water, width='stretch', key=f"overview_water_{stage}")
+    
+    top_cat = summary['top_cat']
+    error_y = 'Error' if 'Error' in top_cat.columns else None
+    fig_cat = px.bar(top_cat, x='Category', y='Total_Sales', error_y=error_y, color='Total_Sales', template="plotly_dark", color_continuous_scale='Teal')
+    slots['cat'].plotly_chart(fig_cat, width='stretch', key=f"overview_cat_{stage}")
 
 # --- Main App ---
 st.title("📈 Branch Analytics Command Center")
@@ -46,23 +141,53 @@ if "dfs" not in st.session_state or "data_loaded" not in st.session_state or not
     st.stop()
 
 # Retrieve DataFrames
-df_sales = st.session_state.dfs['Sales'].copy()
 df_expenses = st.session_state.dfs['Expenses'].copy()
 df_inventory = st.session_state.dfs['Inventory'].copy()
 df_staff = st.session_state.dfs['Staff'].copy()
 
 # Apply Global Filter
-df_sales_filtered = filter_by_date(df_sales, 'Date')
+sales_sample = st.session_state.get('sales_sample')
+approx_mode = False
+if sales_sample is not None:
+    # The sample covers every day, so its bounds avoid scanning the full Sales sheet
+    date_range = date_range_input(sales_sample['_day'].min().date(), sales_sample['_day'].max().date())
+    st.sidebar.subheader("⚡ Performance")
+    approx_mode = st.sidebar.toggle(
+        "Approximate mode",
+        value=False,
+        help="Show instant estimates from a stratified sample, then swap in exact values once computed."
+    )
+else:
+    df_sales = st.session_state.dfs['Sales'].copy()
+    df_sales['Date'] = pd.to_datetime(df_sales['Date'])
+    date_range = date_range_input(df_sales['Date'].min().date(), df_sales['Date'].max().date())
 
 # Sync Expense Filter
-if 'global_date_filter' in st.session_state and len(st.session_state.global_date_filter) == 2:
-    start_d, end_d = st.session_state.global_date_filter
+if date_range is not None and len(date_range) == 2:
+    start_d, end_d = date_range
     df_expenses['Date'] = pd.to_datetime(df_expenses['Date'])
     mask_exp = (df_expenses['Date'].dt.date >= start_d) & (df_expenses['Date'].dt.date <= end_d)
     df_expenses_filtered = df_expenses[mask_exp]
 else:
     df_expenses_filtered = df_expenses
 
+# Approximate mode: paint the Overview from the ingest-time sample while the full
+# Sales sheet is filtered and aggregated in the background
+exact_future = None
+if approx_mode:
+    if date_range is not None and len(date_range) == 2:
+        sample_filtered = filter_sample_by_date(sales_sample, *date_range)
+    else:
+        sample_filtered = sales_sample
+    exact_future = exact_sales_job(st.session_state.dfs['Sales'], date_range)
+    overview_summary = summarize_sales_sample(sample_filtered)
+else:
+    if sales_sample is not None:
+        df_sales_filtered = load_sales(st.session_state.dfs['Sales'], date_range)
+    else:
+        df_sales_filtered = apply_date_range(df_sales, 'Date', date_range)
+    overview_summary = summarize_sales(df_sales_filtered)
+
 # --- Tabs ---
 tabs = st.tabs([
     "🏠 Overview", 
@@ -79,19 +204,14 @@ with tabs[0]:
     st.markdown("### 🏢 Executive Summary")
     st.write("A high-level view of your branch's financial and operational health.")
     
-    # Kpi Calculations
-    total_sales = df_sales_filtered['Total_Sales'].sum()
-    total_expenses = df_expenses_filtered['Amount'].sum()
-    net_profit = total_sales - total_expenses
-    profit_margin = (net_profit / total_sales * 100) if total_sales > 0 else 0
-    total_orders = len(df_sales_filtered)
+    approx_note = st.empty()
+    if approx_mode:
+        approx_note.info(f"⚡ Showing estimates from a {len(sample_filtered):,}-row stratified sample. Refining to exact values...")
     
-    # KPIS
-    k1, k2, k3, k4 = st.columns(4)
-    metric_card(k1, "Total Sales", f"${total_sales:,.0f}", "Gross Revenue")
-    metric_card(k2, "Total Expenses", f"${total_expenses:,.0f}", "Operational Costs")
-    metric_card(k3, "Net Profit", f"${net_profit:,.0f}", f"Margin: {profit_margin:.1f}%")
-    metric_card(k4, "Total Orders", f"{total_orders:,}", "Transactions handled")
+    # Placeholders are filled from the sample first and replaced once exact values are ready
+    overview_slots = {'kpis': st.empty()}
+    total_expenses = df_expenses_filtered['Amount'].sum()
+    exp_ts = df_expenses_filtered.groupby(pd.Grouper(key='Date', freq='D'))['Amount'].sum().reset_index()
     
     st.markdown("---")
     
@@ -100,37 +220,18 @@ with tabs[0]:
     with c1:
         st.markdown("#### 📉 Revenue & Cost Dynamics")
         st.caption("How your daily revenue tracks against operational expenditures.")
-        sales_ts = df_sales_filtered.groupby(pd.Grouper(key='Date', freq='D'))['Total_Sales'].sum().reset_index()
-        exp_ts = df_expenses_filtered.groupby(pd.Grouper(key='Date', freq='D'))['Amount'].sum().reset_index()
-        
-        fig_ts = go.Figure()
-        fig_ts.add_trace(go.Scatter(x=sales_ts['Date'], y=sales_ts['Total_Sales'], mode='lines', name='Sales', line=dict(color='#00CC96', width=3)))
-        fig_ts.add_trace(go.Scatter(x=exp_ts['Date'], y=exp_ts['Amount'], mode='lines', name='Expenses', line=dict(color='#EF553B', width=3)))
-        fig_ts.update_layout(template="plotly_dark", hovermode="x unified", legend=dict(orientation="h", y=1.1))
-        st.plotly_chart(fig_ts, width='stretch')
+        overview_slots['ts'] = st.empty()
 
     with c2:
         st.markdown("#### 🌊 Profit Waterfall")
         st.caption("Visualizing the bridge from Revenue to Net Profit.")
-        fig_water = go.Figure(go.Waterfall(
-            orientation = "v",
-            measure = ["relative", "relative", "total"],
-            x = ["Sales", "Expenses", "Net Profit"],
-            y = [total_sales, -total_expenses, net_profit],
-            connector = {"line":{"color":"gray"}},
-            text = [f"${total_sales/1000:.1f}k", f"-${total_expenses/1000:.1f}k", f"${net_profit/1000:.1f}k"],
-            textposition = "auto"
-        ))
-        fig_water.update_layout(template="plotly_dark", showlegend=False)
-        st.plotly_chart(fig_water, width='stretch')
+        overview_slots['water'] = st.empty()
 
     c3, c4 = st.columns(2)
     with c3:
         st.markdown("#### 🏆 Top Sales Categories")
         st.caption("identifying which product groups drive the most revenue.")
-        top_cat = df_sales_filtered.groupby('Category')['Total_Sales'].sum().reset_index().sort_values('Total_Sales', ascending=False)
-        fig_cat = px.bar(top_cat, x='Category', y='Total_Sales', color='Total_Sales', template="plotly_dark", color_continuous_scale='Teal')
-        st.plotly_chart(fig_cat, width='stretch')
+        overview_slots['cat'] = st.empty()
 
     with c4:
         st.markdown("#### 💸 Expense Allocation")
@@ -139,6 +240,18 @@ with tabs[0]:
         fig_exp = px.bar(top_exp, x='Amount', y='Expense_Type', orientation='h', template="plotly_dark", color='Amount', color_continuous_scale='Reds')
         st.plotly_chart(fig_exp, width='stretch')
 
+    render_overview(overview_slots, overview_summary, total_expenses, exp_ts, "approx" if approx_mode else "exact")
+
+    # Swap in exact values as soon as they are ready, before the other tabs render
+    if exact_future is not None:
+        # Poll rather than block: each element update lets a new date selection interrupt this run
+        while not exact_future.done():
+            approx_note.info(f"⚡ Showing estimates from a {len(sample_filtered):,}-row stratified sample. Refining to exact values...")
+            time.sleep(0.25)
+        df_sales_filtered, exact_summary = exact_future.result()
+        render_overview(overview_slots, exact_summary, total_expenses, exp_ts, "exact")
+        approx_note.success("✅ Exact values loaded.")
+
 # ==========================================
 # 2. SALES ANALYSIS
 # ==========================================
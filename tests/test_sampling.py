@@ -0,0 +1,57 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.sampling import build_stratified_sample, estimate_sum, filter_sample_by_date, population_count
+
+
+@pytest.fixture
+def sales():
+    rng = np.random.default_rng(0)
+    n = 2_000
+    return pd.DataFrame({
+        'Date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 30 * 24, n), unit='h'),
+        'Category': rng.choice(['Food', 'Drinks', 'Snacks'], n),
+        'Branch': rng.choice(['North', 'South'], n),
+        'Total_Sales': rng.integers(1, 500, n),
+    })
+
+
+def test_full_sample_matches_exact_sums(sales):
+    sample = build_stratified_sample(sales, fraction=1.0)
+
+    total, se = estimate_sum(sample, 'Total_Sales')
+    assert total == pytest.approx(sales['Total_Sales'].sum())
+    assert se == 0
+
+    by_cat = estimate_sum(sample, 'Total_Sales', by='Category').set_index('Category')
+    exact = sales.groupby('Category')['Total_Sales'].sum()
+    assert by_cat['estimate'].to_dict() == pytest.approx(exact.to_dict())
+    assert (by_cat['se'] == 0).all()
+
+
+def test_population_count_matches_filtered_rows(sales):
+    sample = build_stratified_sample(sales, fraction=0.05)
+    start, end = date(2024, 1, 5), date(2024, 1, 20)
+
+    filtered = filter_sample_by_date(sample, start, end)
+    expected = sales['Date'].dt.date.between(start, end).sum()
+    assert population_count(filtered) == expected
+
+
+def test_partial_sample_has_positive_se(sales):
+    sample = build_stratified_sample(sales, fraction=0.1, min_per_stratum=2)
+
+    assert len(sample) < len(sales)
+    _, se = estimate_sum(sample, 'Total_Sales')
+    assert se > 0
+
+
+def test_falls_back_to_coarser_strata_when_sample_too_large(sales):
+    fine = build_stratified_sample(sales, fraction=0.01, min_per_stratum=2)
+    coarse = build_stratified_sample(sales, fraction=0.01, min_per_stratum=2, max_fraction=len(fine) / len(sales) - 0.01)
+
+    assert len(coarse) < len(fine)
+    assert population_count(coarse) == len(sales)
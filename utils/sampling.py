@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+# Sales rows are stratified by these columns plus the calendar day of `Date`,
+# falling back to coarser levels when the finer one yields too large a sample.
+STRATA_LEVELS = [['Category', 'Branch'], ['Category']]
+Z_95 = 1.96
+
+def _allocate(work, keys, fraction, min_per_stratum):
+    """Returns stratum ids, stratum sizes and per-row sample quotas for `keys`."""
+    grouped = work.groupby(keys, sort=False, dropna=False)
+    sizes = grouped['Date'].transform('size')
+    quota = np.minimum(sizes, np.maximum(min_per_stratum, np.ceil(sizes * fraction)))
+    return grouped.ngroup(), sizes, quota
+
+def build_stratified_sample(df, value_cols=('Total_Sales',), fraction=0.01, min_per_stratum=2, max_fraction=None, seed=42):
+    """Draws a Category/Branch/day stratified sample of the Sales sheet.
+
+    Each row keeps the size of the stratum it was drawn from (`_stratum_size`),
+    so totals can be estimated for any date range: strata never straddle a day.
+    Small strata are over-sampled by `min_per_stratum`; if that pushes the sample
+    above `max_fraction` of the sheet, Branch is dropped from the strata.
+    """
+    work = df[['Date', *STRATA_LEVELS[0], *value_cols]].copy()
+    work['Date'] = pd.to_datetime(work['Date'])
+    work['_day'] = work['Date'].dt.normalize()
+
+    for strata_cols in STRATA_LEVELS:
+        stratum, sizes, quota = _allocate(work, [*strata_cols, '_day'], fraction, min_per_stratum)
+        if max_fraction is None or quota.sum() <= max_fraction * len(work):
+            break
+    work['_stratum'] = stratum
+
+    # Random rank within each stratum; keep the first `quota` rows.
+    work['_rand'] = np.random.default_rng(seed).random(len(work))
+    rank = work.groupby('_stratum', sort=False)['_rand'].rank(method='first')
+    keep = rank <= quota
+
+    sample = work[keep].drop(columns='_rand')
+    sample['_stratum_size'] = sizes[keep].astype(int)
+    return sample.reset_index(drop=True)
+
+def filter_sample_by_date(sample, start_date, end_date):
+    """Keeps whole strata whose day falls within [start_date, end_date]."""
+    mask = (sample['_day'].dt.date >= start_date) & (sample['_day'].dt.date <= end_date)
+    return sample[mask]
+
+def estimate_sum(sample, value_col, by=None):
+    """Estimates the population sum of `value_col` and its standard error.
+
+    Uses the stratified estimator with finite population correction. `by` may
+    be 'Category', '_day' or both (present at every strata level); returns a
+    DataFrame with `estimate` and `se` per group, or an (estimate, se) tuple.
+    """
+    by_cols = [by] if isinstance(by, str) else list(by or [])
+    agg = {
+        'n': (value_col, 'size'),
+        'N': ('_stratum_size', 'first'),
+        'mean': (value_col, 'mean'),
+        'var': (value_col, 'var'),
+    }
+    agg.update({col: (col, 'first') for col in by_cols})
+    strata = sample.groupby('_stratum', sort=False).agg(**agg)
+
+    strata['estimate'] = strata['N'] * strata['mean']
+    fpc = 1 - strata['n'] / strata['N']
+    strata['variance'] = (strata['N'] ** 2 * fpc * strata['var'].fillna(0) / strata['n'])
+
+    if not by_cols:
+        return float(strata['estimate'].sum()), float(np.sqrt(strata['variance'].sum()))
+
+    result = strata.groupby(by_cols, dropna=False)[['estimate', 'variance']].sum().reset_index()
+    result['se'] = np.sqrt(result.pop('variance'))
+    return result
+
+def population_count(sample):
+    """Number of population rows covered by the sample (exact, from stratum sizes)."""
+    return int(sample.groupby('_stratum', sort=False)['_stratum_size'].first().sum())
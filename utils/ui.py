@@ -48,6 +48,11 @@ def load_css():
                 font-size: 0.9rem;
                 margin-top: 5px;
             }
+            .metric-error {
+                color: #FFC857;
+                font-size: 0.8rem;
+                margin-top: 4px;
+            }
             
             /* Headers */
             h1, h2, h3 {
@@ -82,13 +87,15 @@ def project_header():
     st.markdown("# 🚀 Guided Analytics Platform")
     st.markdown("---")
 
-def metric_card(col, title, value, description=None, prefix="", suffix=""):
-    """Renders a styled metric card."""
+def metric_card(col, title, value, description=None, prefix="", suffix="", error=None):
+    """Renders a styled metric card. `error` shows an error bound for estimated values."""
     desc_html = f'<div class="metric-description">{description}</div>' if description else ""
+    error_html = f'<div class="metric-error">{error}</div>' if error else ""
     col.markdown(f"""
     <div class="metric-card">
         <div class="metric-title">{title}</div>
         <div class="metric-value">{prefix}{value}{suffix}</div>
         {desc_html}
+        {error_html}
     </div>
     """, unsafe_allow_html=True)